@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import re
+import string
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+from itertools import chain
+from typing import Dict, Iterator, Tuple, Optional
 
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
@@ -34,19 +36,66 @@ KNOWN_TEXTUAL_EMOTES = {
 
 COMMAND_REGEX = re.compile(r"^![a-zA-Z0-9_]+")
 
-
-@dataclass
+# IRC `emotes` tag: "<id>:<start>-<end>,<start>-<end>/<id>:..."; ids may be
+# non-numeric (e.g. "emotesv2_<hex>").
+_EMOTE_TAG_REGEX = re.compile(r"([^:/]+):((?:\d+-\d+,?)+)")
+_EMOTE_SPAN_REGEX = re.compile(r"(\d+)-(\d+)")
+
+# Polarity per boost term, matched in one pass over the lowercased message. A term
+# only counts as a whole whitespace-separated token, optionally wrapped in
+# "!,?." punctuation, the same tokens a whitespace split plus strip("!,?.") yields.
+_BOOST_POLARITY = {
+    **{term: 1 for term in POSITIVE_BOOST},
+    **{term: -1 for term in NEGATIVE_BOOST},
+}
+_BOOST_REGEX = re.compile(
+    r"(?<!\S)[!,?.]*("
+    + "|".join(re.escape(term) for term in sorted(_BOOST_POLARITY, key=len, reverse=True))
+    + r")[!,?.]*(?!\S)"
+)
+
+# Case-folded emote name -> canonical spelling, so any casing resolves with one
+# dict lookup after the combined scan below.
+_EMOTE_LOOKUP = {name.lower(): name for name in KNOWN_TEXTUAL_EMOTES}
+_TEXTUAL_EMOTE_REGEX = re.compile(
+    r"(?<![A-Za-z0-9_])(?:"
+    + "|".join(re.escape(name) for name in sorted(_EMOTE_LOOKUP, key=len, reverse=True))
+    + r")(?![A-Za-z0-9_])",
+    # ASCII-only case folding: in Unicode mode "ſ" would match "s" and "K" (Kelvin)
+    # would match "k", yielding matches that lower() cannot map back to a name.
+    re.IGNORECASE | re.ASCII,
+)
+
+# Bound matchers for the per-message hot path, saving an attribute lookup per call.
+_IS_COMMAND = COMMAND_REGEX.match
+_FIND_EMOTE_TAGS = _EMOTE_TAG_REGEX.finditer
+_FIND_EMOTE_SPANS = _EMOTE_SPAN_REGEX.finditer
+_FIND_BOOSTS = _BOOST_REGEX.finditer
+_FIND_TEXTUAL_EMOTES = _TEXTUAL_EMOTE_REGEX.finditer
+_FIND_WORDS = re.compile(r"[A-Za-z0-9_]+").findall
+
+# (provider, emote_id, name) where provider is "twitch", "textual" or "7tv".
+Emote = Tuple[str, str, str]
+
+
+@dataclass(slots=True, frozen=True)
 class AnalysisResult:
     sentiment_label: str
     sentiment_score: float
-    emotes: List[Tuple[str, str]]
+    emotes: Tuple[Emote, ...]
 
 
 class MessageAnalyzer:
     """Runs sentiment analysis and emote extraction for chat messages."""
 
+    # Chat is highly repetitive ("W", "LUL", copypastas), so VADER compounds are
+    # memoized per exact message text with FIFO eviction.
+    SCORE_CACHE_SIZE = 4096
+
     def __init__(self) -> None:
         self._sentiment = SentimentIntensityAnalyzer()
+        self._lexicon = self._sentiment.lexicon
+        self._score_cache: Dict[str, float] = {}
 
     def analyze(
         self,
@@ -56,26 +105,34 @@ class MessageAnalyzer:
     ) -> AnalysisResult:
         tags = tags or {}
         sentiment_label, sentiment_score = self._score_sentiment(content)
-        emotes = self._extract_emotes(content, tags)
+        emotes: Iterator[Emote] = self._extract_emotes(content, tags)
         if custom_emotes:
-            emotes.extend(self._extract_custom_emotes(content, custom_emotes))
+            emotes = chain(emotes, self._extract_custom_emotes(content, custom_emotes))
         return AnalysisResult(
-            sentiment_label=sentiment_label, sentiment_score=sentiment_score, emotes=emotes
+            sentiment_label=sentiment_label,
+            sentiment_score=sentiment_score,
+            emotes=tuple(emotes),
         )
 
     def _score_sentiment(self, content: str) -> Tuple[str, float]:
         text = content.strip()
-        if not text or COMMAND_REGEX.match(text):
+        if not text or _IS_COMMAND(text):
             return "neutral", 0.0
 
-        scores = self._sentiment.polarity_scores(text)
-        compound = scores["compound"]
+        compound = self._polarity(text)
         lowered = text.lower()
 
-        tokens = {token.strip("!,?.") for token in re.split(r"\s+", lowered) if token}
-        if POSITIVE_BOOST & tokens:
+        pos_hit = neg_hit = False
+        for match in _FIND_BOOSTS(lowered):
+            if _BOOST_POLARITY[match.group(1)] > 0:
+                pos_hit = True
+            else:
+                neg_hit = True
+            if pos_hit and neg_hit:
+                break
+        if pos_hit:
             compound += 0.1
-        if NEGATIVE_BOOST & tokens:
+        if neg_hit:
             compound -= 0.1
 
         compound = max(min(compound, 1.0), -1.0)
@@ -85,46 +142,58 @@ class MessageAnalyzer:
             return "negative", compound
         return "neutral", compound
 
-    def _extract_emotes(self, content: str, tags: Dict[str, str]) -> List[Tuple[str, str]]:
+    def _polarity(self, text: str) -> float:
+        cached = self._score_cache.get(text)
+        if cached is not None:
+            return cached
+        if self._has_lexicon_hit(text):
+            compound = self._sentiment.polarity_scores(text)["compound"]
+        else:
+            compound = 0.0
+        if len(self._score_cache) >= self.SCORE_CACHE_SIZE:
+            del self._score_cache[next(iter(self._score_cache))]
+        self._score_cache[text] = compound
+        return compound
+
+    def _has_lexicon_hit(self, text: str) -> bool:
+        """Return False only when VADER is guaranteed to score ``text`` as 0.0.
+
+        VADER's compound is a function of lexicon valences alone; boosters,
+        negations and punctuation only scale non-zero valences. Non-ASCII text
+        may carry emoji that VADER expands into words, so it always goes through.
+        """
+        if not text.isascii():
+            return True
+        lexicon = self._lexicon
+        for token in text.split():
+            lowered = token.lower()
+            if lowered in lexicon or lowered.strip(string.punctuation) in lexicon:
+                return True
+        return False
+
+    def _extract_emotes(self, content: str, tags: Dict[str, str]) -> Iterator[Emote]:
         emote_tag = tags.get("emotes")
-        emotes: List[Tuple[str, str]] = []
+        found = False
 
         if emote_tag:
-            for entry in emote_tag.split("/"):
-                if not entry:
-                    continue
-                parts = entry.split(":")
-                if len(parts) != 2:
-                    continue
-                emote_id, positions = parts
-                for span in positions.split(","):
-                    if not span:
-                        continue
-                    start_end = span.split("-")
-                    if len(start_end) != 2:
-                        continue
-                    try:
-                        start, end = int(start_end[0]), int(start_end[1])
-                    except ValueError:
-                        continue
-                    name = content[start : end + 1]
-                    emotes.append((emote_id, name))
-
-        if not emotes:
-            for token in re.findall(r"[A-Za-z0-9_]+", content):
-                if token in KNOWN_TEXTUAL_EMOTES or token.upper() in KNOWN_TEXTUAL_EMOTES:
-                    canon = token if token in KNOWN_TEXTUAL_EMOTES else token.upper()
-                    emotes.append((canon, canon))
-
-        return emotes
+            for entry in _FIND_EMOTE_TAGS(emote_tag):
+                emote_id = entry.group(1)
+                for span in _FIND_EMOTE_SPANS(entry.group(2)):
+                    start, end = int(span.group(1)), int(span.group(2))
+                    found = True
+                    yield ("twitch", emote_id, content[start : end + 1])
+
+        if not found:
+            for match in _FIND_TEXTUAL_EMOTES(content):
+                canon = _EMOTE_LOOKUP.get(match.group().lower())
+                if canon:
+                    yield ("textual", canon, canon)
 
     def _extract_custom_emotes(
         self, content: str, custom_emotes: Dict[str, Dict[str, str]]
-    ) -> List[Tuple[str, str]]:
-        hits: List[Tuple[str, str]] = []
-        for token in re.findall(r"[A-Za-z0-9_]+", content):
-            meta = custom_emotes.get(token.lower())
+    ) -> Iterator[Emote]:
+        # Tokenise before lowering: lower() maps some non-ASCII letters (e.g. the
+        # Kelvin sign) to ASCII, which would otherwise form emote names.
+        for meta in map(custom_emotes.get, map(str.lower, _FIND_WORDS(content))):
             if meta:
-                hits.append((f"7tv:{meta['id']}", meta["name"]))
-        return hits
-
+                yield ("7tv", f"7tv:{meta['id']}", meta["name"])
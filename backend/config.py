@@ -22,6 +22,8 @@ class Settings(BaseSettings):
 
     redis_url: str = Field("redis://localhost:6379/0", alias="REDIS_URL")
     redis_use_ssl: bool = Field(False, alias="REDIS_USE_SSL")
+    redis_max_connections: int = Field(64, alias="REDIS_MAX_CONNECTIONS", ge=2)
+    redis_pool_timeout_seconds: float = Field(20.0, alias="REDIS_POOL_TIMEOUT", gt=0)
 
     max_messages: int = Field(10_000, alias="MAX_MESSAGES", ge=100)
     update_interval_ms: int = Field(
@@ -38,7 +40,7 @@ class Settings(BaseSettings):
     )
 
 
-@lru_cache
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
     """Return cached settings instance to avoid repeated reads."""
 
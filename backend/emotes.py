@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import sys
 import time
 from dataclasses import dataclass
+from itertools import islice
 from typing import Dict, List, Optional
 
 import httpx
+import orjson
 
 from .config import get_settings
 
@@ -14,7 +17,7 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SevenTVLookup:
     by_name: Dict[str, Dict[str, str]]
     by_id: Dict[str, Dict[str, str]]
@@ -28,15 +31,29 @@ class EmoteService:
     """Fetches and caches Twitch emote metadata for richer UI rendering."""
 
     def __init__(self) -> None:
-        self._client = httpx.AsyncClient(timeout=10.0)
+        # One pooled HTTP/2 client serves Helix and 7TV so bursts of on-demand
+        # emote lookups reuse warm connections instead of new TLS handshakes.
+        self._client = httpx.AsyncClient(
+            timeout=10.0,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0,
+            ),
+        )
         self._app_token: Optional[str] = settings.twitch_app_token
         self._token_expiry: float = time.time()
         self._cache: Dict[str, Dict[str, str]] = {}
         self._lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
         self._twitch_user_cache: Dict[str, str] = {}
         self._seven_tv_global: Dict[str, Dict[str, str]] = {}
         self._seven_tv_channel: Dict[str, Dict[str, str]] = {}
         self._seven_tv_lock = asyncio.Lock()
+        # Merged lookups are shared between sessions on the same channel and
+        # dropped whenever a global or channel emote map is (re)loaded.
+        self._seven_tv_lookups: Dict[Optional[str], SevenTVLookup] = {}
 
     async def warm_cache(self) -> None:
         if not settings.twitch_client_id or not settings.twitch_client_secret:
@@ -53,19 +70,22 @@ class EmoteService:
             return
 
         if settings.twitch_client_id and settings.twitch_client_secret:
-            payload = {
-                "client_id": settings.twitch_client_id,
-                "client_secret": settings.twitch_client_secret,
-                "grant_type": "client_credentials",
-            }
-            response = await self._client.post(
-                "https://id.twitch.tv/oauth2/token", data=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            self._app_token = data["access_token"]
-            self._token_expiry = time.time() + data.get("expires_in", 3600)
-            logger.info("Fetched new Twitch app token.")
+            async with self._lock:
+                if self._app_token and self._token_expiry - time.time() > 60:
+                    return
+                payload = {
+                    "client_id": settings.twitch_client_id,
+                    "client_secret": settings.twitch_client_secret,
+                    "grant_type": "client_credentials",
+                }
+                response = await self._client.post(
+                    "https://id.twitch.tv/oauth2/token", data=payload
+                )
+                response.raise_for_status()
+                data = response.json()
+                self._app_token = data["access_token"]
+                self._token_expiry = time.time() + data.get("expires_in", 3600)
+                logger.info("Fetched new Twitch app token.")
 
     async def _fetch_global_emotes(self) -> None:
         if not self._app_token:
@@ -78,7 +98,7 @@ class EmoteService:
             "https://api.twitch.tv/helix/chat/emotes/global", headers=headers
         )
         response.raise_for_status()
-        payload = response.json()
+        payload = orjson.loads(response.content)
         for entry in payload.get("data", []):
             self._cache[entry["id"]] = {
                 "id": entry["id"],
@@ -127,34 +147,15 @@ class EmoteService:
 
         # If not cached, attempt on-demand fetch when credentials exist.
         if settings.twitch_client_id and settings.twitch_client_secret:
-            async with self._lock:
-                cached = self._cache.get(emote_id)
-                if cached:
-                    return cached
-                await self._ensure_app_token()
-                if self._app_token:
-                    headers = {
-                        "Client-ID": settings.twitch_client_id,
-                        "Authorization": f"Bearer {self._app_token}",
-                    }
-                    response = await self._client.get(
-                        "https://api.twitch.tv/helix/chat/emotes",
-                        params={"id": emote_id},
-                        headers=headers,
-                    )
-                    if response.status_code == 200:
-                        data = response.json().get("data", [])
-                        if data:
-                            entry = data[0]
-                            meta = {
-                                "id": entry["id"],
-                                "name": entry["name"],
-                                "imageUrl": entry.get("images", {}).get("url_2x")
-                                or entry.get("images", {}).get("url_1x")
-                                or _cdn_url(entry["id"]),
-                            }
-                            self._cache[emote_id] = meta
-                            return meta
+            # Concurrent callers for the same id share one Helix request.
+            fetch = self._inflight.get(emote_id)
+            if fetch is None:
+                fetch = asyncio.create_task(self._fetch_emote_metadata(emote_id))
+                self._inflight[emote_id] = fetch
+                fetch.add_done_callback(lambda _: self._inflight.pop(emote_id, None))
+            meta = await asyncio.shield(fetch)
+            if meta:
+                return meta
 
         return {
             "id": emote_id,
@@ -162,19 +163,54 @@ class EmoteService:
             "imageUrl": _cdn_url(emote_id),
         }
 
+    async def _fetch_emote_metadata(self, emote_id: str) -> Optional[Dict[str, str]]:
+        await self._ensure_app_token()
+        if not self._app_token:
+            return None
+        headers = {
+            "Client-ID": settings.twitch_client_id,
+            "Authorization": f"Bearer {self._app_token}",
+        }
+        response = await self._client.get(
+            "https://api.twitch.tv/helix/chat/emotes",
+            params={"id": emote_id},
+            headers=headers,
+        )
+        if response.status_code != 200:
+            return None
+        data = response.json().get("data", [])
+        if not data:
+            return None
+        entry = data[0]
+        meta = {
+            "id": entry["id"],
+            "name": entry["name"],
+            "imageUrl": entry.get("images", {}).get("url_2x")
+            or entry.get("images", {}).get("url_1x")
+            or _cdn_url(entry["id"]),
+        }
+        self._cache[emote_id] = meta
+        return meta
+
     async def get_known_emotes(self, limit: int = 200) -> List[Dict[str, str]]:
         if not self._cache:
             return []
-        return list(self._cache.values())[:limit]
+        return list(islice(self._cache.values(), limit))
 
     async def get_seven_tv_emotes(self, twitch_user_id: Optional[str]) -> SevenTVLookup:
         await self._ensure_seven_tv_global()
-        by_name: Dict[str, Dict[str, str]] = dict(self._seven_tv_global)
+        channel_map: Dict[str, Dict[str, str]] = {}
         if twitch_user_id:
             channel_map = await self._get_seven_tv_channel_emotes(twitch_user_id)
-            by_name.update(channel_map)
+        lookup = self._seven_tv_lookups.get(twitch_user_id)
+        if lookup is not None:
+            return lookup
+        by_name: Dict[str, Dict[str, str]] = dict(self._seven_tv_global)
+        by_name.update(channel_map)
         by_id = {meta["id"]: meta for meta in by_name.values()}
-        return SevenTVLookup(by_name=by_name, by_id=by_id)
+        lookup = SevenTVLookup(by_name=by_name, by_id=by_id)
+        self._seven_tv_lookups[twitch_user_id] = lookup
+        return lookup
 
     async def close(self) -> None:
         await self._client.aclose()
@@ -188,7 +224,10 @@ class EmoteService:
             try:
                 response = await self._client.get("https://7tv.io/v3/emote-sets/global")
                 response.raise_for_status()
-                self._seven_tv_global = self._normalize_seven_tv_emotes(response.json())
+                self._seven_tv_global = self._normalize_seven_tv_emotes(
+                    orjson.loads(response.content)
+                )
+                self._seven_tv_lookups.clear()
                 logger.info("Cached %s 7TV global emotes.", len(self._seven_tv_global))
             except httpx.HTTPError as exc:
                 logger.warning("Unable to load 7TV global emotes: %s", exc)
@@ -207,10 +246,11 @@ class EmoteService:
                     f"https://7tv.io/v3/users/twitch/{twitch_user_id}"
                 )
                 response.raise_for_status()
-                payload = response.json()
+                payload = orjson.loads(response.content)
                 emote_set = (payload.get("emote_set") or {}).get("emotes", [])
                 normalized = self._normalize_seven_tv_emotes({"emotes": emote_set})
                 self._seven_tv_channel[twitch_user_id] = normalized
+                self._seven_tv_lookups.pop(twitch_user_id, None)
                 return normalized
             except httpx.HTTPError as exc:
                 logger.warning(
@@ -229,31 +269,31 @@ class EmoteService:
             name = entry.get("name")
             if not emote_id or not name:
                 continue
-            image_url = _seven_tv_cdn_url(entry)
-            result[name.lower()] = {
+            # Popular emotes appear in many channel sets; interning lets every
+            # cached lookup share one copy of each id and name.
+            name = sys.intern(name)
+            result[sys.intern(name.lower())] = {
                 "provider": "7tv",
-                "id": emote_id,
+                "id": sys.intern(emote_id),
                 "name": name,
-                "imageUrl": image_url,
+                "imageUrl": _seven_tv_cdn_url(entry),
             }
         return result
 
 
+_CDN_URL_TEMPLATE = "https://static-cdn.jtvnw.net/emoticons/v2/%s/default/%s/%s"
+
+
 def _cdn_url(emote_id: str, theme: str = "dark", scale: str = "2.0") -> str:
-    return (
-        f"https://static-cdn.jtvnw.net/emoticons/v2/{emote_id}/default/{theme}/{scale}"
-    )
+    return _CDN_URL_TEMPLATE % (emote_id, theme, scale)
 
 
 def _seven_tv_cdn_url(entry: Dict[str, str], size: str = "2x") -> str:
     host = entry.get("host") or {}
     base_url = host.get("url")
     files = host.get("files") or []
-    target_format = "webp"
-    for file in files:
-        if file.get("name") == size:
-            target_format = file.get("format", "webp").lower()
-            break
+    target = next((file for file in files if file.get("name") == size), None)
+    target_format = target.get("format", "webp").lower() if target else "webp"
     if base_url:
         if base_url.startswith("//"):
             base_url = f"https:{base_url}"
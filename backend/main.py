@@ -2,21 +2,24 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 import uuid
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
 
+import orjson
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
-from .analyzer import MessageAnalyzer
+from .analyzer import Emote, MessageAnalyzer
 from .config import get_settings
 from .emotes import EmoteService, SevenTVLookup
+from .message_queue import MessageQueue
 from .models import StartSessionRequest, StartSessionResponse, StopSessionRequest
-from .redis_manager import RedisManager
+from .redis_manager import ChatEvent, RedisManager
 from .twitch_client import TwitchChatClient
 
 logger = logging.getLogger("twitchpulse")
@@ -24,6 +27,15 @@ logging.basicConfig(
     level=logging.INFO, format="[%(levelname)s] %(asctime)s - %(message)s"
 )
 
+# Session key TTLs are re-applied this often while a session is live.
+TTL_REFRESH_SECONDS = 30
+
+# Idle sessions still refresh this often so decaying stats (messages/min) move.
+STATS_HEARTBEAT_SECONDS = 5.0
+# Most chat messages the worker analyses before yielding to write them, which
+# keeps a full queue from blocking the event loop for one long stretch.
+WORKER_BATCH_SIZE = 500
+
 settings = get_settings()
 redis_manager = RedisManager()
 analyzer = MessageAnalyzer()
@@ -40,22 +52,27 @@ app.add_middleware(
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionState:
     session_id: str
     channel: str
     duration: int
-    queue: asyncio.Queue
+    queue: MessageQueue
     bot: TwitchChatClient
     bot_task: asyncio.Task
     processor_task: asyncio.Task
     timer_task: asyncio.Task
+    ttl_task: asyncio.Task
     started_at: datetime
     twitch_user_id: str
     seven_tv_lookup: SevenTVLookup
+    cached_emote_images: Set[str] = field(default_factory=set)
 
 
 active_sessions: Dict[str, SessionState] = {}
+# Latest stats snapshot and its encoding per session, shared by every socket
+# watching that session.
+stats_frames: Dict[str, Tuple[Dict, str]] = {}
 
 
 @app.get("/health")
@@ -106,13 +123,14 @@ async def start_session(payload: StartSessionRequest) -> StartSessionResponse:
         logger.warning("Unable to load 7TV emotes for %s: %s", payload.channel, exc)
         seven_tv_lookup = SevenTVLookup.empty()
 
-    queue: asyncio.Queue = asyncio.Queue(maxsize=5_000)
+    queue = MessageQueue(maxsize=5_000)
     bot = TwitchChatClient(
         channel=payload.channel, message_queue=queue, sample_rate=payload.sample_rate
     )
     processor_task = asyncio.create_task(_message_worker(session_id, queue))
     timer_task = asyncio.create_task(_auto_stop(session_id, duration))
     bot_task = asyncio.create_task(_run_bot(session_id, bot))
+    ttl_task = asyncio.create_task(_refresh_ttls(session_id))
 
     started_at = datetime.now(timezone.utc)
 
@@ -125,6 +143,7 @@ async def start_session(payload: StartSessionRequest) -> StartSessionResponse:
         bot_task=bot_task,
         processor_task=processor_task,
         timer_task=timer_task,
+        ttl_task=ttl_task,
         started_at=started_at,
         twitch_user_id=twitch_user_id,
         seven_tv_lookup=seven_tv_lookup,
@@ -161,63 +180,81 @@ async def get_stats(session_id: str) -> Dict:
 async def stats_socket(websocket: WebSocket, session_id: str) -> None:
     await websocket.accept()
     interval = max(settings.update_interval_ms / 1000, 0.25)
+    updated = asyncio.Event()
     try:
-        while True:
-            stats = await redis_manager.get_stats(session_id)
-            await websocket.send_json(stats)
-            await asyncio.sleep(interval)
+        async with redis_manager.subscribe(session_id, updated.set):
+            while True:
+                updated.clear()
+                await websocket.send_text(await _stats_frame(session_id))
+                # Push at most once per interval; sleep until the worker
+                # publishes new data or the heartbeat lapses.
+                await asyncio.sleep(interval)
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        updated.wait(), timeout=STATS_HEARTBEAT_SECONDS
+                    )
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected for session %s", session_id)
     except Exception as exc:  # pragma: no cover - logging only
         logger.error("WebSocket error for session %s: %s", session_id, exc)
     finally:
+        stats_frames.pop(session_id, None)
         with suppress(Exception):
             await websocket.close()
 
 
-async def _message_worker(session_id: str, queue: asyncio.Queue) -> None:
-    logger.info("Starting message worker for session %s", session_id)
-    try:
-        while True:
-            message = await queue.get()
-            terminate = message is None
-            try:
-                if not terminate:
-                    content: str = message.get("content", "")
-                    tags = message.get("tags") or {}
-                    state = active_sessions.get(session_id)
-                    custom_lookup = (
-                        state.seven_tv_lookup.by_name
-                        if state and state.seven_tv_lookup
-                        else None
-                    )
+async def _stats_frame(session_id: str) -> str:
+    """Return the session's stats as JSON, encoding each stats snapshot only once."""
 
-                    await redis_manager.increment_message_count(session_id)
-                    await redis_manager.increment_chatter(
-                        session_id, message.get("username", "anonymous")
-                    )
+    stats = await redis_manager.get_stats(session_id)
+    cached = stats_frames.get(session_id)
+    if cached and cached[0] is stats:
+        return cached[1]
+    frame = orjson.dumps(stats).decode()
+    stats_frames[session_id] = (stats, frame)
+    return frame
 
-                    analysis = analyzer.analyze(
-                        content, tags, custom_emotes=custom_lookup
-                    )
-                    if analysis.emotes:
-                        await redis_manager.increment_emotes(
-                            session_id, analysis.emotes
-                        )
-                        await _cache_emote_images(session_id, analysis.emotes, state)
-                    await redis_manager.update_sentiment(
-                        session_id, analysis.sentiment_label, analysis.sentiment_score
-                    )
 
-                    timestamp = int(
-                        message.get("timestamp")
-                        or datetime.now(timezone.utc).timestamp()
+async def _message_worker(session_id: str, queue: MessageQueue) -> None:
+    logger.info("Starting message worker for session %s", session_id)
+    _now = time.time
+    try:
+        finished = False
+        while not finished:
+            # Messages queued while the previous batch was being written are
+            # analysed together and applied in one pipeline.
+            batch = await queue.get_batch(WORKER_BATCH_SIZE)
+            state = active_sessions.get(session_id)
+            custom_lookup = (
+                state.seven_tv_lookup.by_name
+                if state and state.seven_tv_lookup
+                else None
+            )
+            events: List[ChatEvent] = []
+            image_emotes: List[Emote] = []
+            for message in batch:
+                if message is None:
+                    finished = True
+                    break
+                content: str = message.get("content", "")
+                tags = message.get("tags") or {}
+                analysis = analyzer.analyze(content, tags, custom_emotes=custom_lookup)
+                events.append(
+                    ChatEvent(
+                        username=message.get("username", "anonymous"),
+                        sentiment_label=analysis.sentiment_label,
+                        sentiment_score=analysis.sentiment_score,
+                        emotes=analysis.emotes,
+                        timestamp=int(message.get("timestamp") or _now()),
                     )
-                    await redis_manager.append_timeline(session_id, timestamp)
-            finally:
-                queue.task_done()
-            if terminate:
-                break
+                )
+                image_emotes.extend(
+                    emote for emote in analysis.emotes if emote[0] != "textual"
+                )
+            if events:
+                await redis_manager.apply_batch(session_id, events)
+            if image_emotes:
+                await _cache_emote_images(session_id, image_emotes, state)
     except asyncio.CancelledError:  # graceful shutdown
         logger.info("Message worker for %s cancelled", session_id)
     except Exception as exc:
@@ -231,6 +268,16 @@ async def _auto_stop(session_id: str, duration: int) -> None:
     await _stop_session(session_id, from_timer=True)
 
 
+async def _refresh_ttls(session_id: str) -> None:
+    interval = max(min(TTL_REFRESH_SECONDS, settings.session_ttl_seconds // 3), 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await redis_manager.refresh_ttls(session_id)
+        except Exception as exc:
+            logger.warning("TTL refresh failed for session %s: %s", session_id, exc)
+
+
 async def _stop_session(session_id: str, *, from_timer: bool) -> None:
     state = active_sessions.pop(session_id, None)
     if not state:
@@ -245,6 +292,7 @@ async def _stop_session(session_id: str, *, from_timer: bool) -> None:
         state.processor_task.cancel()
     with suppress(asyncio.CancelledError):
         await state.processor_task
+    state.ttl_task.cancel()
 
     if not from_timer:
         with suppress(asyncio.CancelledError):
@@ -254,10 +302,9 @@ async def _stop_session(session_id: str, *, from_timer: bool) -> None:
     with suppress(asyncio.CancelledError):
         await state.bot_task
     status = "complete" if from_timer else "stopped"
-    await redis_manager.close_session(session_id, status=status)
-    await redis_manager.append_timeline(
-        session_id, int(datetime.now(timezone.utc).timestamp())
-    )
+    await redis_manager.close_session(session_id, status=status, dropped=state.bot.dropped)
+    await redis_manager.append_timeline(session_id, int(time.time()))
+    await redis_manager.refresh_ttls(session_id)
 
 
 async def _run_bot(session_id: str, bot: TwitchChatClient) -> None:
@@ -270,20 +317,39 @@ async def _run_bot(session_id: str, bot: TwitchChatClient) -> None:
 
 
 async def _cache_emote_images(
-    session_id: str, emotes: List[Tuple[str, str]], state: SessionState | None
+    session_id: str, emotes: List[Emote], state: SessionState | None
 ) -> None:
-    unique = {emote_id: name for emote_id, name in emotes}
-    for emote_id, emote_name in unique.items():
-        if emote_id.startswith("7tv:"):
+    cached = state.cached_emote_images if state else set()
+    pending = {
+        emote_id: (provider, name)
+        for provider, emote_id, name in emotes
+        if emote_id not in cached
+    }
+    if not pending:
+        return
+
+    images: Dict[str, str] = {}
+    twitch_emotes: List[Tuple[str, str]] = []
+    for emote_id, (provider, emote_name) in pending.items():
+        if provider == "7tv":
             if state and state.seven_tv_lookup:
                 lookup = state.seven_tv_lookup.by_id.get(emote_id.split(":", 1)[1])
                 if lookup and lookup.get("imageUrl"):
-                    await redis_manager.set_emote_image(
-                        session_id, emote_id, lookup["imageUrl"]
-                    )
-            continue
-        if not emote_id.isdigit():
-            continue
-        meta = await emote_service.get_emote_metadata(emote_id, emote_name)
-        if meta.get("imageUrl"):
-            await redis_manager.set_emote_image(session_id, emote_id, meta["imageUrl"])
+                    images[emote_id] = lookup["imageUrl"]
+        elif provider == "twitch":
+            twitch_emotes.append((emote_id, emote_name))
+
+    if twitch_emotes:
+        metas = await asyncio.gather(
+            *(
+                emote_service.get_emote_metadata(emote_id, emote_name)
+                for emote_id, emote_name in twitch_emotes
+            )
+        )
+        for (emote_id, _), meta in zip(twitch_emotes, metas):
+            if meta.get("imageUrl"):
+                images[emote_id] = meta["imageUrl"]
+
+    if images:
+        await redis_manager.set_emote_images(session_id, images)
+    cached.update(pending)
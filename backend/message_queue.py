@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, List, Optional
+
+
+class MessageQueue:
+    """Bounded buffer handing chat payloads from one producer to one consumer.
+
+    A lighter stand-in for ``asyncio.Queue`` on the ingest hot path: a put is a
+    list append plus ``Event.set``, and the consumer takes queued items in batches
+    with ``get_batch``, usually by swapping two lists. ``put_nowait`` raises
+    ``asyncio.QueueFull`` like the stdlib.
+    """
+
+    __slots__ = ("_items", "_spare", "_ready", "_maxsize")
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._items: List[Any] = []
+        self._spare: List[Any] = []
+        self._ready = asyncio.Event()
+        self._maxsize = maxsize
+
+    def put_nowait(self, item: Any) -> None:
+        if self._maxsize and len(self._items) >= self._maxsize:
+            raise asyncio.QueueFull
+        self._items.append(item)
+        self._ready.set()
+
+    async def get_batch(self, limit: Optional[int] = None) -> List[Any]:
+        """Wait for at least one item, then return up to ``limit`` queued items.
+
+        The returned list may be recycled by the next call, so finish with it first.
+        """
+
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        if limit and len(self._items) > limit:
+            batch = self._items[:limit]
+            del self._items[:limit]
+            return batch
+        batch = self._items
+        self._spare.clear()
+        self._items = self._spare
+        self._spare = batch
+        return batch
@@ -1,17 +1,112 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
+from redis.exceptions import NoScriptError
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+@dataclass(slots=True, frozen=True)
+class ChatEvent:
+    """An analysed chat message, ready to be applied to session counters."""
+
+    username: str
+    sentiment_label: str
+    sentiment_score: float
+    emotes: Tuple[Tuple[str, str, str], ...]
+    timestamp: int
+
+
+@dataclass(slots=True, frozen=True)
+class SessionKeys:
+    """Redis key names for one session, built once and reused on every call."""
+
+    info: str
+    chatters: str
+    emotes: str
+    emote_names: str
+    emote_images: str
+    sentiment: str
+    messages: str
+    timeline: str
+    updates: str
+    # Every data key, for TTL refreshes and purges.
+    data: Tuple[str, ...]
+    # KEYS for MESSAGE_SCRIPT, in the order it expects.
+    message_script: Tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def _session_keys(session_id: str) -> SessionKeys:
+    prefix = f"session:{session_id}:"
+    info = prefix + "info"
+    chatters = prefix + "chatters"
+    emotes = prefix + "emotes"
+    emote_names = prefix + "emote_names"
+    emote_images = prefix + "emote_images"
+    sentiment = prefix + "sentiment"
+    messages = prefix + "messages"
+    timeline = prefix + "timeline"
+    return SessionKeys(
+        info=info,
+        chatters=chatters,
+        emotes=emotes,
+        emote_names=emote_names,
+        emote_images=emote_images,
+        sentiment=sentiment,
+        messages=messages,
+        timeline=timeline,
+        updates=prefix + "updated",
+        data=(info, chatters, emotes, emote_names, sentiment, messages, timeline, emote_images),
+        message_script=(messages, chatters, emotes, sentiment, timeline),
+    )
+
+
+# Full per-message counter update, applied atomically server-side. The timeline
+# is a hash of per-second message counts keyed by unix timestamp.
+# KEYS: messages, chatters, emotes, sentiment, timeline
+# ARGV: username, sentiment_label, sentiment_score, timestamp, [emote_id, count]...
+MESSAGE_SCRIPT = """
+redis.call('INCRBY', KEYS[1], 1)
+redis.call('ZINCRBY', KEYS[2], 1, ARGV[1])
+for i = 5, #ARGV, 2 do
+    redis.call('ZINCRBY', KEYS[3], ARGV[i + 1], ARGV[i])
+end
+redis.call('HINCRBY', KEYS[4], ARGV[2], 1)
+redis.call('HINCRBYFLOAT', KEYS[4], ARGV[2] .. '_sum', ARGV[3])
+redis.call('HINCRBY', KEYS[5], ARGV[4], 1)
+return 1
+"""
+
+# How long a get_stats snapshot is shared between callers (half the default
+# 500 ms dashboard push interval).
+STATS_CACHE_SECONDS = 0.25
+
+# Fallback artwork for emotes whose image URL was never cached.
+TWITCH_CDN_URL = "https://static-cdn.jtvnw.net/emoticons/v2/%s/default/dark/2.0"
+
+# Every session publishes to "session:<id>:updated" after its counters change.
+UPDATES_CHANNEL_PATTERN = "session:*:updated"
+# Backoff bounds for resubscribing after the update listener loses its connection.
+UPDATES_RETRY_MIN_SECONDS = 0.5
+UPDATES_RETRY_MAX_SECONDS = 10.0
+
+
 class RedisManager:
     """Encapsulates all Redis interactions for chat sessions."""
 
@@ -19,30 +114,49 @@ class RedisManager:
         redis_kwargs = {
             "encoding": "utf-8",
             "decode_responses": True,
+            "max_connections": settings.redis_max_connections,
+            "timeout": settings.redis_pool_timeout_seconds,
+            "health_check_interval": 30,
         }
         # Only pass the ssl flag when the instance actually needs TLS. Older redis-py
         # releases (including the wheel bundled with python:slim) choke on ssl=None.
         if settings.redis_use_ssl:
             redis_kwargs["ssl"] = True
 
-        self._client = Redis.from_url(
-            settings.redis_url,
-            **redis_kwargs,
+        # A blocking pool makes callers wait for a free connection when every one is
+        # busy, instead of failing with "Too many connections".
+        self._client = Redis(
+            connection_pool=BlockingConnectionPool.from_url(settings.redis_url, **redis_kwargs)
         )
+        self._message_script = self._client.register_script(MESSAGE_SCRIPT)
+        self._update_listeners: Dict[str, Set[Callable[[], None]]] = {}
+        self._updates_task: Optional[asyncio.Task] = None
+        # Emote ids whose display names this process has already stored, per session.
+        self._known_emote_names: Dict[str, Set[str]] = {}
+        # Recent get_stats snapshots and in-flight reads, keyed by (session_id, top_n).
+        self._stats_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._stats_reads: Dict[Tuple[str, int], asyncio.Task] = {}
 
     async def ping(self) -> bool:
         return bool(await self._client.ping())
 
-    async def initialize_session(self, session_id: str, channel: str, duration: int) -> None:
-        await self.purge_session(session_id)
+    async def initialize_session(
+        self, session_id: str, channel: str, duration: int, fresh: bool = True
+    ) -> None:
+        """Create the session's info hash and message counter.
+
+        Session ids are random, so a ``fresh`` session has no keys to clear. Pass
+        ``fresh=False`` when reusing an id to drop leftovers in the same round trip.
+        """
 
         now = datetime.now(timezone.utc).isoformat()
-        info_key = self._info_key(session_id)
-        timeline_key = self._timeline_key(session_id)
+        keys = _session_keys(session_id)
 
         pipe = self._client.pipeline()
+        if not fresh:
+            pipe.unlink(*keys.data)
         pipe.hset(
-            info_key,
+            keys.info,
             mapping={
                 "channel": channel.lower(),
                 "duration": duration,
@@ -50,135 +164,275 @@ class RedisManager:
                 "started_at": now,
             },
         )
-        pipe.expire(info_key, settings.session_ttl_seconds)
-        pipe.set(self._message_count_key(session_id), 0)
-        pipe.expire(self._message_count_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(self._chatters_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(self._emotes_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(self._emote_names_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(self._emote_images_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(self._sentiment_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(timeline_key, settings.session_ttl_seconds)
+        pipe.expire(keys.info, settings.session_ttl_seconds)
+        pipe.set(keys.messages, 0)
+        pipe.expire(keys.messages, settings.session_ttl_seconds)
         await pipe.execute()
 
-    async def purge_session(self, session_id: str) -> None:
-        keys = [
-            self._info_key(session_id),
-            self._chatters_key(session_id),
-            self._emotes_key(session_id),
-            self._emote_names_key(session_id),
-            self._sentiment_key(session_id),
-            self._message_count_key(session_id),
-            self._timeline_key(session_id),
-            self._emote_images_key(session_id),
-        ]
-        if keys:
-            await self._client.delete(*keys)
-
-    async def close_session(self, session_id: str, status: str = "complete") -> None:
-        info_key = self._info_key(session_id)
-        await self._client.hset(info_key, mapping={"status": status, "ended_at": self._now()})
-
-    async def increment_message_count(self, session_id: str, amount: int = 1) -> int:
-        key = self._message_count_key(session_id)
-        new_value = await self._client.incrby(key, amount)
-        await self._client.expire(key, settings.session_ttl_seconds)
-        return new_value
-
-    async def increment_chatter(self, session_id: str, username: str) -> None:
-        key = self._chatters_key(session_id)
-        await self._client.zincrby(key, 1, username.lower())
-        await self._client.expire(key, settings.session_ttl_seconds)
-
-    async def increment_emotes(self, session_id: str, emotes: List[Tuple[str, str]]) -> None:
-        if not emotes:
-            return
-        pipe = self._client.pipeline()
-        for emote_id, emote_name in emotes:
-            pipe.hincrby(self._emotes_key(session_id), emote_id, 1)
-            pipe.hsetnx(self._emote_names_key(session_id), emote_id, emote_name)
-        pipe.expire(self._emotes_key(session_id), settings.session_ttl_seconds)
-        pipe.expire(self._emote_names_key(session_id), settings.session_ttl_seconds)
+    async def refresh_ttls(self, session_id: str) -> None:
+        """Re-apply the session TTL to every session key in one round trip.
+
+        Writers do not set TTLs themselves; the session lifecycle calls this
+        periodically and once more after the final writes.
+        """
+
+        pipe = self._client.pipeline(transaction=False)
+        for key in _session_keys(session_id).data:
+            pipe.expire(key, settings.session_ttl_seconds)
         await pipe.execute()
 
-    async def set_emote_image(self, session_id: str, emote_id: str, image_url: str) -> None:
-        if not image_url:
+    async def purge_session(self, session_id: str) -> None:
+        await self._client.unlink(*_session_keys(session_id).data)
+
+    async def close_session(
+        self, session_id: str, status: str = "complete", dropped: int = 0
+    ) -> None:
+        self._known_emote_names.pop(session_id, None)
+        keys = _session_keys(session_id)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.hset(
+            keys.info,
+            mapping={"status": status, "ended_at": self._now(), "dropped": dropped},
+        )
+        pipe.publish(keys.updates, 1)
+        await pipe.execute()
+        self._invalidate_stats(session_id)
+
+    @asynccontextmanager
+    async def subscribe(
+        self, session_id: str, callback: Callable[[], None]
+    ) -> AsyncIterator[None]:
+        """Invoke ``callback`` whenever the session's stats change.
+
+        All subscribers share one pattern subscription, so the number of Redis
+        connections does not grow with connected dashboards.
+        """
+
+        listeners = self._update_listeners.setdefault(session_id, set())
+        listeners.add(callback)
+        if self._updates_task is None or self._updates_task.done():
+            self._updates_task = asyncio.create_task(self._listen_updates())
+        try:
+            yield
+        finally:
+            listeners.discard(callback)
+            if not listeners and self._update_listeners.get(session_id) is listeners:
+                del self._update_listeners[session_id]
+
+    async def _listen_updates(self) -> None:
+        delay = UPDATES_RETRY_MIN_SECONDS
+        reconnecting = False
+        while self._update_listeners:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(UPDATES_CHANNEL_PATTERN)
+                if reconnecting:
+                    # Updates published while disconnected were missed; wake every
+                    # subscriber so it re-reads instead of waiting for a heartbeat.
+                    self._notify_all()
+                    reconnecting = False
+                async for message in pubsub.listen():
+                    delay = UPDATES_RETRY_MIN_SECONDS
+                    session_id = message["channel"].split(":", 2)[1]
+                    # Writers in other processes only reach us through this channel.
+                    self._invalidate_stats(session_id)
+                    for callback in tuple(self._update_listeners.get(session_id, ())):
+                        callback()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(
+                    "Session update listener failed, retrying in %.1fs: %s", delay, exc
+                )
+            finally:
+                await pubsub.aclose()
+            reconnecting = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, UPDATES_RETRY_MAX_SECONDS)
+
+    def _notify_all(self) -> None:
+        for session_id, listeners in tuple(self._update_listeners.items()):
+            self._invalidate_stats(session_id)
+            for callback in tuple(listeners):
+                callback()
+
+    async def set_emote_images(self, session_id: str, images: Dict[str, str]) -> None:
+        if not images:
             return
-        key = self._emote_images_key(session_id)
-        await self._client.hset(key, emote_id, image_url)
-        await self._client.expire(key, settings.session_ttl_seconds)
-
-    async def update_sentiment(self, session_id: str, label: str, score: float) -> None:
-        sent_key = self._sentiment_key(session_id)
-        pipe = self._client.pipeline()
-        pipe.hincrby(sent_key, label, 1)
-        pipe.hincrbyfloat(sent_key, f"{label}_sum", float(score))
-        pipe.expire(sent_key, settings.session_ttl_seconds)
+        # Images are cached after the batch that introduced the emotes was published,
+        # so publish again; otherwise sockets keep a frame with fallback URLs.
+        keys = _session_keys(session_id)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.hset(keys.emote_images, mapping=images)
+        pipe.publish(keys.updates, 1)
         await pipe.execute()
+        self._invalidate_stats(session_id)
 
     async def append_timeline(self, session_id: str, timestamp: int) -> None:
-        key = self._timeline_key(session_id)
-        pipe = self._client.pipeline()
-        pipe.rpush(key, str(timestamp))
-        pipe.ltrim(key, -1200, -1)  # keep roughly last 20 minutes
-        pipe.expire(key, settings.session_ttl_seconds)
-        await pipe.execute()
+        await self._client.hincrby(_session_keys(session_id).timeline, timestamp, 1)
+
+    async def apply_batch(self, session_id: str, events: Iterable[ChatEvent]) -> None:
+        """Apply many messages in one pipeline and notify subscribers once."""
+
+        keys = _session_keys(session_id)
+        known_names = self._known_emote_names.setdefault(session_id, set())
+        new_names: Dict[str, str] = {}
+        calls: List[List[Any]] = []
+        for event in events:
+            args: List[Any] = [
+                event.username.lower(),
+                event.sentiment_label,
+                float(event.sentiment_score),
+                event.timestamp,
+            ]
+            if event.emotes:
+                for _, emote_id, emote_name in event.emotes:
+                    if emote_id not in known_names and emote_id not in new_names:
+                        new_names[emote_id] = emote_name
+                for emote_id, count in Counter(emote[1] for emote in event.emotes).items():
+                    args.append(emote_id)
+                    args.append(count)
+            calls.append(args)
+        if not calls:
+            return
+
+        script = self._message_script
+
+        def queue(pipe: Pipeline) -> None:
+            for args in calls:
+                pipe.evalsha(script.sha, len(keys.message_script), *keys.message_script, *args)
+            if new_names:
+                pipe.hset(keys.emote_names, mapping=new_names)
+            pipe.publish(keys.updates, 1)
+
+        await self._execute_with_script(script, queue)
+        self._invalidate_stats(session_id)
+        known_names.update(new_names)
+
+    async def _execute_with_script(
+        self, script: AsyncScript, queue: Callable[[Pipeline], None]
+    ) -> List[Any]:
+        """Run a pipeline that queues EVALSHA for ``script``, loading it on NOSCRIPT.
+
+        Calling a registered script with ``client=pipe`` makes redis-py send a
+        blocking SCRIPT EXISTS before every execute; queuing EVALSHA directly keeps
+        the pipeline to one round trip. The script is only (re)loaded when Redis
+        does not have it yet, e.g. on first use or after a restart.
+        """
+
+        pipe = self._client.pipeline(transaction=False)
+        queue(pipe)
+        try:
+            return await pipe.execute()
+        except NoScriptError:
+            await self._client.script_load(script.script)
+        pipe = self._client.pipeline(transaction=False)
+        queue(pipe)
+        return await pipe.execute()
 
     async def get_stats(self, session_id: str, top_n: int = 10) -> Dict[str, Any]:
-        info_key = self._info_key(session_id)
-        timeline_key = self._timeline_key(session_id)
-        message_key = self._message_count_key(session_id)
-
-        info, timeline, total_messages = await asyncio.gather(
-            self._client.hgetall(info_key),
-            self._client.lrange(timeline_key, 0, -1),
-            self._client.get(message_key),
+        """Return the session's dashboard stats.
+
+        Concurrent callers share one Redis read, and its result is reused for
+        ``STATS_CACHE_SECONDS``. The returned dict is shared and must not be mutated.
+        """
+
+        key = (session_id, top_n)
+        cached = self._stats_cache.get(key)
+        if cached is not None:
+            return cached
+        read = self._stats_reads.get(key)
+        if read is None:
+            read = asyncio.create_task(self._read_stats(session_id, top_n))
+            self._stats_reads[key] = read
+            read.add_done_callback(
+                lambda done: self._stats_reads.pop(key, None)
+                if self._stats_reads.get(key) is done
+                else None
+            )
+        return await asyncio.shield(read)
+
+    def _invalidate_stats(self, session_id: str) -> None:
+        """Drop the session's cached snapshot and detach reads started before a write.
+
+        A detached read still answers the callers already waiting on it, but does
+        not populate the cache, so the next caller reads the new data.
+        """
+
+        for cache in (self._stats_cache, self._stats_reads):
+            for key in [key for key in cache if key[0] == session_id]:
+                del cache[key]
+
+    async def _read_stats(self, session_id: str, top_n: int) -> Dict[str, Any]:
+        keys = _session_keys(session_id)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.hgetall(keys.info)
+        pipe.get(keys.messages)
+        pipe.zcard(keys.chatters)
+        pipe.zrange(
+            keys.chatters, 0, top_n - 1, desc=True, withscores=True, score_cast_func=int
         )
-
-        total_messages = int(total_messages or 0)
-        chatter_count, top_chatters = await asyncio.gather(
-            self._client.zcard(self._chatters_key(session_id)),
-            self._client.zrevrange(self._chatters_key(session_id), 0, top_n - 1, withscores=True),
+        pipe.zrange(
+            keys.emotes, 0, top_n - 1, desc=True, withscores=True, score_cast_func=int
         )
-
-        emote_counts = await self._client.hgetall(self._emotes_key(session_id))
-        emote_names = await self._client.hgetall(self._emote_names_key(session_id))
-        emote_images = await self._client.hgetall(self._emote_images_key(session_id))
-        sentiment = await self._client.hgetall(self._sentiment_key(session_id))
-
-        top_emotes = self._format_top_emotes(emote_counts, emote_names, emote_images, top_n)
+        pipe.hgetall(keys.sentiment)
+        now = int(time.time())
+        pipe.hmget(keys.timeline, range(now - 59, now + 1))
+        (
+            info,
+            total_messages,
+            chatter_count,
+            top_chatters,
+            emote_counts,
+            sentiment,
+            recent_counts,
+        ) = await pipe.execute()
+        total_messages = int(total_messages or 0)
+        messages_per_minute = sum(int(count) for count in recent_counts if count)
+
+        top_emotes: List[Dict[str, Any]] = []
+        if emote_counts:
+            emote_ids = [emote_id for emote_id, _ in emote_counts]
+            pipe = self._client.pipeline(transaction=False)
+            pipe.hmget(keys.emote_names, emote_ids)
+            pipe.hmget(keys.emote_images, emote_ids)
+            emote_names, emote_images = await pipe.execute()
+            top_emotes = self._format_top_emotes(emote_counts, emote_names, emote_images)
         sentiment_summary = self._format_sentiment(sentiment)
 
-        minutes_window_count = self._count_recent(timeline, window_seconds=60)
-        messages_per_minute = minutes_window_count
-
-        return {
+        stats = {
             "sessionId": session_id,
             "session": info,
             "messageCount": total_messages,
             "chatterCount": chatter_count,
             "messagesPerMinute": messages_per_minute,
-            "topChatters": [{"username": name, "count": int(score)} for name, score in top_chatters],
+            "topChatters": [{"username": name, "count": count} for name, count in top_chatters],
             "topEmotes": top_emotes,
             "sentiment": sentiment_summary,
         }
+        cache_key = (session_id, top_n)
+        if self._stats_reads.get(cache_key) is asyncio.current_task():
+            self._stats_cache[cache_key] = stats
+            asyncio.get_running_loop().call_later(
+                STATS_CACHE_SECONDS, self._stats_cache.pop, cache_key, None
+            )
+        return stats
 
     def _format_top_emotes(
-        self, counts: Dict[str, str], names: Dict[str, str], images: Dict[str, str], limit: int
+        self,
+        counts: List[Tuple[str, int]],
+        names: List[Optional[str]],
+        images: List[Optional[str]],
     ) -> List[Dict[str, Any]]:
-        scored = [(emote_id, int(count)) for emote_id, count in counts.items()]
-        scored.sort(key=lambda item: item[1], reverse=True)
-        result = []
-        for emote_id, count in scored[:limit]:
-            result.append(
-                {
-                    "id": emote_id,
-                    "name": names.get(emote_id, emote_id),
-                    "count": count,
-                    "imageUrl": images.get(emote_id) or self._emote_cdn_url(emote_id),
-                }
-            )
-        return result
+        return [
+            {
+                "id": emote_id,
+                "name": name or emote_id,
+                "count": count,
+                "imageUrl": image or TWITCH_CDN_URL % emote_id,
+            }
+            for (emote_id, count), name, image in zip(counts, names, images)
+        ]
 
     def _format_sentiment(self, sentiment: Dict[str, str]) -> Dict[str, Any]:
         positive = int(sentiment.get("positive", 0))
@@ -195,41 +449,7 @@ class RedisManager:
             "neutralPct": round((neutral / total) * 100, 2),
         }
 
-    def _count_recent(self, entries: List[str], window_seconds: int) -> int:
-        if not entries:
-            return 0
-        cutoff = int(time.time()) - window_seconds
-        return sum(1 for raw_ts in entries if raw_ts and int(raw_ts) >= cutoff)
-
-    @staticmethod
-    def _emote_cdn_url(emote_id: str, theme: str = "dark", scale: str = "2.0") -> str:
-        return f"https://static-cdn.jtvnw.net/emoticons/v2/{emote_id}/default/{theme}/{scale}"
-
     @staticmethod
     def _now() -> str:
         return datetime.now(timezone.utc).isoformat()
 
-    def _info_key(self, session_id: str) -> str:
-        return f"session:{session_id}:info"
-
-    def _chatters_key(self, session_id: str) -> str:
-        return f"session:{session_id}:chatters"
-
-    def _emotes_key(self, session_id: str) -> str:
-        return f"session:{session_id}:emotes"
-
-    def _emote_names_key(self, session_id: str) -> str:
-        return f"session:{session_id}:emote_names"
-
-    def _emote_images_key(self, session_id: str) -> str:
-        return f"session:{session_id}:emote_images"
-
-    def _sentiment_key(self, session_id: str) -> str:
-        return f"session:{session_id}:sentiment"
-
-    def _message_count_key(self, session_id: str) -> str:
-        return f"session:{session_id}:messages"
-
-    def _timeline_key(self, session_id: str) -> str:
-        return f"session:{session_id}:timeline"
-
@@ -7,9 +7,11 @@ import asyncio
 import random
 import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 
-from .analyzer import MessageAnalyzer
-from .redis_manager import RedisManager
+from .analyzer import AnalysisResult, MessageAnalyzer
+from .redis_manager import ChatEvent, RedisManager
 
 EMOTES = ["Kappa", "PogChamp", "KEKW", "LUL", "BibleThump", "FeelsGoodMan"]
 MESSAGES = [
@@ -22,27 +24,79 @@ MESSAGES = [
     "why did he do that LUL",
 ]
 
+# (username, message, timestamp) as generated, before analysis.
+RawMessage = Tuple[str, str, int]
 
-async def run_simulation(count: int, channel: str, duration: int) -> str:
+_worker_analyzer: Optional[MessageAnalyzer] = None
+
+
+def _init_worker() -> None:
+    global _worker_analyzer
+    _worker_analyzer = MessageAnalyzer()
+
+
+def _analyze_batch(messages: List[str]) -> List[AnalysisResult]:
+    """Analyse a batch inside a pool worker, reusing that worker's analyzer."""
+
+    analyze = _worker_analyzer.analyze
+    return [analyze(message, {}) for message in messages]
+
+
+async def run_simulation(
+    count: int,
+    channel: str,
+    duration: int,
+    batch_size: int = 500,
+    concurrency: int = 32,
+    workers: Optional[int] = None,
+) -> str:
     session_id = uuid.uuid4().hex
     redis_manager = RedisManager()
-    analyzer = MessageAnalyzer()
+    loop = asyncio.get_running_loop()
 
     await redis_manager.initialize_session(session_id, channel, duration)
     start = time.time()
 
-    for index in range(count):
-        username = f"user_{index % 150}"
-        message = random.choice(MESSAGES)
-        if random.random() > 0.6:
-            message += f" {random.choice(EMOTES)}"
-        analysis = analyzer.analyze(message, {})
-        await redis_manager.increment_message_count(session_id)
-        await redis_manager.increment_chatter(session_id, username)
-        if analysis.emotes:
-            await redis_manager.increment_emotes(session_id, analysis.emotes)
-        await redis_manager.update_sentiment(session_id, analysis.sentiment_label, analysis.sentiment_score)
-        await redis_manager.append_timeline(session_id, int(time.time()))
+    # Bounds the batches in flight; each one is analysed in the process pool and
+    # then written over its own pooled connection.
+    slots = asyncio.Semaphore(concurrency)
+    writes: List[asyncio.Task] = []
+
+    async def write(pool: ProcessPoolExecutor, batch: List[RawMessage]) -> None:
+        try:
+            analyses = await loop.run_in_executor(
+                pool, _analyze_batch, [message for _, message, _ in batch]
+            )
+            events = [
+                ChatEvent(
+                    username=username,
+                    sentiment_label=analysis.sentiment_label,
+                    sentiment_score=analysis.sentiment_score,
+                    emotes=analysis.emotes,
+                    timestamp=timestamp,
+                )
+                for (username, _, timestamp), analysis in zip(batch, analyses)
+            ]
+            await redis_manager.apply_batch(session_id, events)
+        finally:
+            slots.release()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        batch: List[RawMessage] = []
+        for index in range(count):
+            message = random.choice(MESSAGES)
+            if random.random() > 0.6:
+                message += f" {random.choice(EMOTES)}"
+            batch.append((f"user_{index % 150}", message, int(time.time())))
+            if len(batch) >= batch_size:
+                await slots.acquire()
+                writes.append(asyncio.create_task(write(pool, batch)))
+                batch = []
+        if batch:
+            await slots.acquire()
+            writes.append(asyncio.create_task(write(pool, batch)))
+        await asyncio.gather(*writes)
+    await redis_manager.refresh_ttls(session_id)
 
     elapsed = time.time() - start
     print(f"Inserted {count} synthetic messages in {elapsed:.2f}s (session {session_id}).")
@@ -54,9 +108,25 @@ def main() -> None:
     parser.add_argument("--count", type=int, default=5000, help="Total fake messages to insert.")
     parser.add_argument("--channel", type=str, default="testchannel", help="Channel label.")
     parser.add_argument("--duration", type=int, default=120, help="Virtual duration for the session.")
+    parser.add_argument("--batch", type=int, default=500, help="Messages written per Redis pipeline.")
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="Redis pipelines kept in flight at once."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Analysis processes (defaults to CPU count)."
+    )
     args = parser.parse_args()
 
-    session_id = asyncio.run(run_simulation(args.count, args.channel, args.duration))
+    session_id = asyncio.run(
+        run_simulation(
+            args.count,
+            args.channel,
+            args.duration,
+            batch_size=max(args.batch, 1),
+            concurrency=max(args.concurrency, 1),
+            workers=max(args.workers, 1) if args.workers else None,
+        )
+    )
     print(f"Session ready. Connect UI with session ID: {session_id}")
 
 
@@ -0,0 +1,68 @@
+import pytest
+
+from backend.analyzer import MessageAnalyzer
+
+
+# 7TV-style lookup keyed by lowercase name, covering the names probed below.
+CUSTOM_EMOTES = {
+    "kekw": {"id": "abc", "name": "KEKW"},
+    "monkas": {"id": "def", "name": "monkaS"},
+    "biblethump": {"id": "ghi", "name": "BibleThump"},
+}
+
+
+@pytest.fixture(scope="module")
+def analyzer() -> MessageAnalyzer:
+    return MessageAnalyzer()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "monkaſ",  # LATIN SMALL LETTER LONG S folds to "s"
+        "BıbleThump hi",  # LATIN SMALL LETTER DOTLESS I folds to "i"
+        "KEKW",  # KELVIN SIGN folds to "k"
+    ],
+)
+def test_unicode_case_folds_are_not_emotes(analyzer: MessageAnalyzer, content: str) -> None:
+    assert analyzer.analyze(content, custom_emotes=CUSTOM_EMOTES).emotes == ()
+
+
+def test_custom_emotes_match_any_ascii_casing(analyzer: MessageAnalyzer) -> None:
+    assert analyzer.analyze("kEkW", custom_emotes=CUSTOM_EMOTES).emotes == (
+        ("textual", "KEKW", "KEKW"),
+        ("7tv", "7tv:abc", "KEKW"),
+    )
+
+
+def test_textual_emotes_match_any_ascii_casing(analyzer: MessageAnalyzer) -> None:
+    assert analyzer.analyze("monkas KEKW biblethump").emotes == (
+        ("textual", "monkaS", "monkaS"),
+        ("textual", "KEKW", "KEKW"),
+        ("textual", "BibleThump", "BibleThump"),
+    )
+
+
+@pytest.mark.parametrize(
+    ("content", "label"),
+    [
+        # Boost terms only count as whole whitespace-separated tokens, optionally
+        # wrapped in "!,?." punctuation; labels match the original split/strip logic.
+        ("l'amour", "neutral"),
+        ("l-o-l", "neutral"),
+        ("gg's", "neutral"),
+        ("(gg)", "neutral"),
+        ("gg_wp", "neutral"),
+        ("nice-ish", "neutral"),
+        ("pog:", "neutral"),
+        ("..gg?!", "positive"),
+        ("so cringe!!", "negative"),
+    ],
+)
+def test_boost_terms_need_whole_tokens(analyzer: MessageAnalyzer, content: str, label: str) -> None:
+    assert analyzer.analyze(content).sentiment_label == label
+
+
+def test_boost_ignores_slash_joined_terms(analyzer: MessageAnalyzer) -> None:
+    plain = analyzer.analyze("e lol").sentiment_score
+    assert analyzer.analyze("w/e lol").sentiment_score == plain
@@ -7,6 +7,7 @@ from twitchio import Message
 from twitchio.ext import commands
 
 from .config import get_settings
+from .message_queue import MessageQueue
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -15,7 +16,7 @@ settings = get_settings()
 class TwitchChatClient(commands.Bot):
     """Thin wrapper around TwitchIO Bot that pushes messages into an asyncio queue."""
 
-    def __init__(self, channel: str, message_queue: asyncio.Queue, sample_rate: int = 1) -> None:
+    def __init__(self, channel: str, message_queue: MessageQueue, sample_rate: int = 1) -> None:
         if not settings.twitch_chat_oauth_token:
             raise RuntimeError("TWITCH_CHAT_OAUTH_TOKEN is required to connect to Twitch chat.")
 
@@ -27,33 +28,64 @@ class TwitchChatClient(commands.Bot):
         )
         self._queue = message_queue
         self._sample_rate = max(sample_rate, 1)
+        # Power-of-two rates are sampled with a bit mask instead of a modulo.
+        self._sample_mask = (
+            self._sample_rate - 1
+            if self._sample_rate & (self._sample_rate - 1) == 0
+            else None
+        )
         self._counter = 0
         self._channel = channel.lower()
+        # Messages lost to a full queue: over the session, and in the current burst.
+        self.dropped = 0
+        self._burst_dropped = 0
 
     async def event_ready(self) -> None:
         logger.info("Connected to Twitch chat as %s", self.nick)
 
     async def event_message(self, message: Message) -> None:  # type: ignore[override]
-        if message.echo or message.author is None:
+        author = message.author
+        if author is None or message.echo:
             return
 
-        self._counter += 1
-        if self._sample_rate > 1 and self._counter % self._sample_rate != 0:
-            return
+        if self._sample_rate > 1:
+            self._counter += 1
+            mask = self._sample_mask
+            if mask is not None:
+                if self._counter & mask:
+                    return
+            elif self._counter % self._sample_rate:
+                return
 
+        # Tags and the rest of the message are only read for sampled messages.
+        username = author.name
+        sent_at = message.timestamp
         payload = {
-            "username": message.author.name,
-            "display_name": message.author.display_name or message.author.name,
+            "username": username,
+            "display_name": author.display_name or username,
             "content": message.content,
             "tags": message.tags or {},
             "channel": self._channel,
-            "timestamp": message.timestamp.timestamp() if message.timestamp else None,
+            "timestamp": sent_at.timestamp() if sent_at else None,
         }
         try:
             self._queue.put_nowait(payload)
         except asyncio.QueueFull:
-            logger.warning("Message queue full, dropping chat message.")
+            self.dropped += 1
+            self._burst_dropped += 1
+            return
+        if self._burst_dropped:
+            logger.warning(
+                "Message queue was full, dropped %s chat messages.", self._burst_dropped
+            )
+            self._burst_dropped = 0
 
     async def shutdown(self) -> None:
         logger.info("Shutting down Twitch chat client for #%s", self._channel)
+        if self.dropped:
+            logger.warning(
+                "Dropped %s chat messages for #%s while the queue was full.",
+                self.dropped,
+                self._channel,
+            )
         await self.close()